@@ -1,124 +1,63 @@
-import streamlit as st
-import pandas as pd
-
-st.set_page_config(page_title="Skin Recommendation Engine", layout="centered")
-
-@st.cache_data
-def load_products():
-    return pd.read_csv('products.csv')
+import os
 
-df = load_products()
+import numpy as np
+import streamlit as st
 
+from constants import (
+    AREAS,
+    BROWSE_COLUMNS,
+    BROWSE_PAGE_SIZE,
+    CATALOG_PATH,
+    CONCERN_OPTIONS,
+    CONCERNS_MAP,
+    NEXT_GOALS,
+    RECOMMENDED_COLUMNS,
+    ROUTINE_STEPS,
+    SKIN_TYPE_EXPLANATIONS,
+    SKIN_TYPES,
+)
+from engine import (
+    compute_routine,
+    load_products,
+    product_records,
+    search_products,
+)
 
+st.set_page_config(page_title="Skin Recommendation Engine", layout="centered")
 
-SKIN_TYPE_EXPLANATIONS = {
-    "Oily": "Skin that gets shiny quickly, especially on the T-zone, and may be prone to breakouts.",
-    "Dry": "Skin that feels tight, flaky, or rough and lacks moisture.",
-    "Combination": "Oily in some areas (usually forehead, nose, chin) and dry/normal in others (cheeks).",
-    "Normal": "Balanced — not too oily or dry, with few issues."
-}
+RNG = np.random.default_rng()
 
-def is_safe(row, is_sensitive, is_pregnant, using_prescription):
-    if is_pregnant and (row.get('contains_retinol', '') == 'Yes' or row.get('prescripition_only', '') == 'Yes'):
-        return False
-    if is_sensitive and row.get('safe_for_sensitive', '') != 'Yes':
-        return False
-    if using_prescription and (row.get('contains_retinol', '') == 'Yes' or row.get('contains_acid', '') == 'Yes'):
-        return False
-    return True
+CATALOG_VERSION = os.path.getmtime(CATALOG_PATH)
+df = load_products(CATALOG_VERSION)
 
 def build_routine(df, skin_type, concerns, is_sensitive, is_pregnant, using_prescription, area):
-    # Super relaxed area filter
-    if area == "Face":
-        filtered = df[~df['name'].str.lower().str.contains('body wash|shower gel', na=False)]  # only exclude heavy body cleansers
-    elif area == "Body":
-        filtered = df[df['name'].str.lower().str.contains('body', na=False)]
-    else:
-        filtered = df.copy()
-
-    # Safety only
-    filtered = filtered[filtered.apply(lambda row: is_safe(row, is_sensitive, is_pregnant, using_prescription), axis=1)]
-
-    # Extremely permissive skin type filter — almost everything
-    type_pattern = 'All'  # base is everything
-    if skin_type == "Oily":
-        type_pattern += '|Oily|Acne-prone'  # add acne-prone for oily
-    elif skin_type == "Dry":
-        type_pattern += '|Dry'
-    filtered = filtered[
-        filtered['suitable_skin_types'].str.contains(type_pattern, case=False, na=True)
-    ]
-
-    # Default to something useful if no concerns
-    if not concerns:
-        if skin_type == "Oily":
-            concerns = ["acne"]
-        elif skin_type == "Dry":
-            concerns = ["dryness"]
-        else:
-            concerns = ["dull"]
-
-    # Concerns filter — loose
-    if concerns:
-        filtered = filtered.reset_index(drop=True)
-        mask = pd.Series([False] * len(filtered))
-        for c in concerns:
-            if c == "acne":
-                keywords = "acne|blemish|pore|salicylic|benzoyl|breakout|niacinamide|oil control"
-            elif c == "dark spots / uneven tone":
-                keywords = "brightening|even tone|fade spots|whitening|hyperpigmentation|dark spots|melasma|pigment|arbutin|kojic|niacinamide|vitamin c|tranexamic"
-            elif c == "dryness":
-                keywords = "hydration|hyaluronic|moisturizing|dryness|ceramide"
-            else:
-                keywords = ""
-            if keywords:
-                mask |= filtered['primary_target'].str.contains(keywords, case=False, na=False)
-                mask |= filtered['secondary_target'].str.contains(keywords, case=False, na=False)
-                mask |= filtered['key_actives'].str.contains(keywords, case=False, na=False)
-        filtered = filtered[mask]
+    # Concerns are ORed, so order and repeats don't matter; a canonical key lets every
+    # permutation of the same answers share one cache entry
+    concerns_key = tuple(sorted(set(concerns)))
+    by_step = compute_routine(df, CATALOG_VERSION, skin_type, concerns_key, is_sensitive, is_pregnant, using_prescription, area)
 
     st.success("Here's your routine:")
 
-    recommended_products = []
-
-    # 1. Cleanse
-    cleansers = filtered[filtered['step'] == '1. Cleanse']
-    if not cleansers.empty:
-        chosen = cleansers.sample(1).iloc[0]
-        st.write(f"**1. Cleanse** → {chosen['product_id']} — {chosen['name']}")
-        recommended_products.append(chosen)
-    else:
-        st.write("**1. Cleanse** → Any gentle cleanser")
-
-    # 2. Tone
-    toners = filtered[filtered['step'] == '2. Tone/Exfoliate']
-    if not toners.empty:
-        chosen = toners.sample(1).iloc[0]
-        st.write(f"**2. Tone** → {chosen['product_id']} — {chosen['name']}")
-        recommended_products.append(chosen)
-    else:
-        st.write("**2. Tone** → Any hydrating toner")
-
-    # 3. Treat
-    treats = filtered[filtered['step'] == '3. Treat']
-    if not treats.empty:
-        chosen = treats.sample(1).iloc[0]
-        st.write(f"**3. Treat** → {chosen['product_id']} — {chosen['name']}")
-        recommended_products.append(chosen)
-    else:
-        st.write("**3. Treat** → Any serum")
-
-    # 4. Moisturize
-    moist = filtered[filtered['step'] == '4. Moisturize']
-    if not moist.empty:
-        chosen = moist.sample(1).iloc[0]
-        st.write(f"**4. Moisturize** → {chosen['product_id']} — {chosen['name']}")
-        recommended_products.append(chosen)
-    else:
-        st.write("**4. Moisturize** → Any moisturizer")
+    # product_id -> row position of its first pick, in pick order
+    chosen_positions = {}
+
+    # Picks come straight from the prebuilt records, so no per-step frames are materialized;
+    # the steps are collected and emitted as one markdown element
+    records = product_records(df, CATALOG_VERSION)
+    lines = []
+    for label, step_key, fallback in ROUTINE_STEPS:
+        candidates = by_step.get(step_key)
+        if candidates:
+            pos = candidates[RNG.integers(len(candidates))]
+            chosen = records[pos]
+            lines.append(f"**{label}** → {chosen['product_id']} — {chosen['name']}")
+            chosen_positions.setdefault(chosen['product_id'], pos)
+        else:
+            lines.append(f"**{label}** → {fallback}")
 
     # 5. Protect
-    st.write("**5. Protect** → Any SPF 50+ in the morning")
+    lines.append("**5. Protect** → Any SPF 50+ in the morning")
+    st.markdown("\n\n".join(lines))
 
     st.info("Start slow • Patch test • Use what feels good")
 
@@ -126,107 +65,103 @@ def build_routine(df, skin_type, concerns, is_sensitive, is_pregnant, using_pres
     st.markdown("---")
     st.subheader("🛒 Products Recommended for You")
 
-    seen = set()
-    unique_products = []
-    for p in recommended_products:
-        if p['product_id'] not in seen:
-            seen.add(p['product_id'])
-            unique_products.append(p)
+    # Picks were deduped on product_id as they were made, so the table is a positional
+    # view of the catalog rather than a frame assembled from the picks
+    unique_positions = list(chosen_positions.values())
 
-    if unique_products:
+    if unique_positions:
         st.write("Here are the products we picked for you:")
-        cols = st.columns(min(3, len(unique_products)))
-        for idx, p in enumerate(unique_products):
-            with cols[idx % 3]:
-                st.markdown(f"**{p['product_id']}**")
-                st.write(p['name'])
-                st.caption(f"{p['primary_target']} • {p['key_actives']}")
+        # One table element instead of three widgets per product card
+        st.dataframe(df.iloc[unique_positions][RECOMMENDED_COLUMNS], hide_index=True)
     else:
         st.info("No specific matches this time — general advice is safe!")
 
     # Next Goals - Teaser
     st.markdown("---")
     st.subheader("🌟 Your Next Skin Goals")
-    st.write("• Crystal clear skin")
-    st.write("• Natural glow")
-    st.write("• Youthful bounce")
+    st.markdown("\n\n".join(f"• {goal}" for goal in NEXT_GOALS))
     st.success("Come back soon for better recommendations. Your glow-up is coming! 🔜")
 
 # UI
 st.title("👋 Welcome to Skin Recommendation Engine")
 st.write("Hi! Let's build your routine.")
 
-with st.form("skin_form"):
-    st.subheader("Your Skin Type")
-    skin_option = st.selectbox("Select:", ["Oily", "Dry", "Combination", "Normal", "Not sure"])
-
-    if skin_option == "Not sure":
-        st.info("Quick guide:")
-        for k, v in SKIN_TYPE_EXPLANATIONS.items():
-            st.write(f"• **{k}**: {v}")
-        skin_option = st.selectbox("Best match?", ["Oily", "Dry", "Combination", "Normal"])
-
-    st.subheader("Current Concerns")
-    concern_options = [
-        "Acne / breakouts",
-        "Dark spots / hyperpigmentation / melasma",
-        "Dryness / dehydration",
-        "Dull skin",
-        "Uneven texture / rough skin",
-        "Aging / fine lines",
-        "Sensitivity / irritation",
-        "Damaged barrier",
-        "None"
-    ]
-    selected_concerns = st.multiselect("Select all:", concern_options)
-
-    st.subheader("Any apply?")
-    sensitive = st.checkbox("Skin reacts easily")
-    pregnant = st.checkbox("Pregnant / breastfeeding")
-    prescription = st.checkbox("Using prescription skincare")
-
-    area = st.radio("Shopping for:", ("Face", "Body", "Both"))
-
-    submitted = st.form_submit_button("Get Routine", type="primary")
-
-if submitted:
-    concerns_map = {
-        "Acne / breakouts": "acne",
-        "Dark spots / hyperpigmentation / melasma": "dark spots / uneven tone",
-        "Dryness / dehydration": "dryness",
-        "Dull skin": "dull",
-        "Uneven texture / rough skin": "texture / rough skin",
-        "Aging / fine lines": "aging",
-        "Sensitivity / irritation": "sensitivity",
-        "Damaged barrier": "barrier damage"
-    }
-    concerns = [concerns_map.get(c) for c in selected_concerns if c != "None"]
-
-    is_sensitive = sensitive
-    is_pregnant = pregnant
-    using_prescription = prescription
-
-    if is_pregnant or using_prescription:
-        st.warning("Safety first! Consult doctor.")
-    elif is_sensitive and len(concerns) > 2:
-        st.warning("Complex concerns — seek professional advice.")
-    else:
-        build_routine(df, skin_option, concerns, is_sensitive, is_pregnant, using_prescription, area)
+# Form and result rerun as a fragment, so submitting doesn't re-execute the rest of the page
+@st.fragment
+def routine_section():
+    with st.form("skin_form"):
+        st.subheader("Your Skin Type")
+        skin_option = st.selectbox("Select:", SKIN_TYPES + ["Not sure"])
+
+        if skin_option == "Not sure":
+            st.info("Quick guide:")
+            for k, v in SKIN_TYPE_EXPLANATIONS.items():
+                st.write(f"• **{k}**: {v}")
+            skin_option = st.selectbox("Best match?", SKIN_TYPES)
+
+        st.subheader("Current Concerns")
+        selected_concerns = st.multiselect("Select all:", CONCERN_OPTIONS)
+
+        st.subheader("Any apply?")
+        sensitive = st.checkbox("Skin reacts easily")
+        pregnant = st.checkbox("Pregnant / breastfeeding")
+        prescription = st.checkbox("Using prescription skincare")
+
+        area = st.radio("Shopping for:", AREAS)
+
+        submitted = st.form_submit_button("Get Routine", type="primary")
+
+    if submitted:
+        concerns = [CONCERNS_MAP[c] for c in selected_concerns if c in CONCERNS_MAP]
+
+        is_sensitive = sensitive
+        is_pregnant = pregnant
+        using_prescription = prescription
+
+        if is_pregnant or using_prescription:
+            st.warning("Safety first! Consult doctor.")
+        elif is_sensitive and len(concerns) > 2:
+            st.warning("Complex concerns — seek professional advice.")
+        else:
+            build_routine(df, skin_option, concerns, is_sensitive, is_pregnant, using_prescription, area)
 
 # Shopping
-st.markdown("---")
-st.subheader("🛒 Browse Products")
-query = st.text_input("Search keyword")
-if query:
-    matches = df[df['name'].str.lower().str.contains(query.lower(), na=False)]
-    if matches.empty:
-        st.info("No matches — try another word")
-    else:
-        for _, p in matches.iterrows():
-            with st.expander(f"**{p['product_id']} — {p['name']}**"):
-                st.write(f"Best for: {p['primary_target']} • {p['secondary_target']}")
-                st.write(f"Key actives: {p['key_actives']}")
-                st.write(f"Use: {p['recommended_time']} — {p['max_frequency']}")
+def _turn_page(step):
+    st.session_state['search_offset'] += step
+
+@st.fragment
+def browse_section():
+    st.markdown("---")
+    st.subheader("🛒 Browse Products")
+    # Search runs only when the form is submitted, not on every keystroke; the last
+    # result is kept in session state and redisplayed on unrelated reruns
+    with st.form("search_form"):
+        query = st.text_input("Search keyword")
+        go = st.form_submit_button("Search")
+    if go:
+        st.session_state['last_matches'] = search_products(df, CATALOG_VERSION, query) if query else None
+        st.session_state['search_offset'] = 0
+    matches = st.session_state.get('last_matches')
+    if matches is not None:
+        if matches.empty:
+            st.info("No matches — try another word")
+        else:
+            # Only one page is rendered per rerun, so short queries that match most of the
+            # catalog cost the same as narrow ones
+            offset = st.session_state.setdefault('search_offset', 0)
+            page = matches.iloc[offset:offset + BROWSE_PAGE_SIZE]
+            # One table element instead of an expander and three writes per match
+            st.dataframe(page[BROWSE_COLUMNS], hide_index=True)
+            if len(matches) > BROWSE_PAGE_SIZE:
+                st.caption(f"Showing {offset + 1}–{offset + len(page)} of {len(matches)}")
+                prev_col, next_col = st.columns(2)
+                prev_col.button("Previous", disabled=offset == 0,
+                                on_click=_turn_page, args=(-BROWSE_PAGE_SIZE,))
+                next_col.button("Next", disabled=offset + BROWSE_PAGE_SIZE >= len(matches),
+                                on_click=_turn_page, args=(BROWSE_PAGE_SIZE,))
+
+routine_section()
+browse_section()
 
 st.caption("Thank you for trusting us with your skin 🌿")
 
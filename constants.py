@@ -0,0 +1,117 @@
+# Static lookup tables for the app. Imported modules run once per process, unlike
+# app.py, which Streamlit re-executes on every rerun.
+import re
+from types import MappingProxyType
+
+SKIN_TYPE_EXPLANATIONS = MappingProxyType({
+    "Oily": "Skin that gets shiny quickly, especially on the T-zone, and may be prone to breakouts.",
+    "Dry": "Skin that feels tight, flaky, or rough and lacks moisture.",
+    "Combination": "Oily in some areas (usually forehead, nose, chin) and dry/normal in others (cheeks).",
+    "Normal": "Balanced — not too oily or dry, with few issues."
+})
+
+SKIN_TYPES = ["Oily", "Dry", "Combination", "Normal"]
+
+AREAS = ("Face", "Body", "Both")
+
+# Form option -> internal concern id ("None" is offered but maps to nothing)
+CONCERNS_MAP = MappingProxyType({
+    "Acne / breakouts": "acne",
+    "Dark spots / hyperpigmentation / melasma": "dark spots / uneven tone",
+    "Dryness / dehydration": "dryness",
+    "Dull skin": "dull",
+    "Uneven texture / rough skin": "texture / rough skin",
+    "Aging / fine lines": "aging",
+    "Sensitivity / irritation": "sensitivity",
+    "Damaged barrier": "barrier damage",
+})
+
+CONCERN_OPTIONS = [*CONCERNS_MAP, "None"]
+
+CONCERN_MAPPING = MappingProxyType({
+    "acne": ["acne", "blemish", "pore", "salicylic", "benzoyl", "breakout", "niacinamide", "oil control"],
+    "dark spots / uneven tone": ["brightening", "even tone", "fade spots", "whitening", "hyperpigmentation", "dark spots",
+                                 "melasma", "pigment", "arbutin", "kojic", "niacinamide", "vitamin c", "tranexamic"],
+    "dryness": ["hydration", "hyaluronic", "moisturizing", "dryness", "ceramide"],
+})
+
+# Compiled once at import so form submissions never pay for regex compilation
+CONCERN_REGEX = {c: re.compile("|".join(map(re.escape, kws)), re.IGNORECASE) for c, kws in CONCERN_MAPPING.items()}
+
+# Bit of each concern in a product's _concern_bits (uint16, so at most 16 concerns)
+CONCERN_BITS = {c: 1 << i for i, c in enumerate(CONCERN_MAPPING)}
+
+# (label shown, catalog step, fallback advice) for each routine step
+ROUTINE_STEPS = [
+    ("1. Cleanse", "1. Cleanse", "Any gentle cleanser"),
+    ("2. Tone", "2. Tone/Exfoliate", "Any hydrating toner"),
+    ("3. Treat", "3. Treat", "Any serum"),
+    ("4. Moisturize", "4. Moisturize", "Any moisturizer"),
+]
+
+CATALOG_PATH = 'products.csv'
+
+# Catalog columns the app actually reads; the rest of products.csv is never loaded
+CATALOG_COLUMNS = [
+    'product_id', 'name', 'step', 'suitable_skin_types', 'safe_for_sensitive',
+    'primary_target', 'secondary_target', 'key_actives',
+    'contains_retinol', 'contains_acid', 'prescription_only',
+    'recommended_time', 'max_frequency',
+]
+
+# Columns shown for Browse Products search results
+BROWSE_COLUMNS = [
+    'product_id', 'name', 'primary_target', 'secondary_target', 'key_actives', 'recommended_time', 'max_frequency',
+]
+
+# Browse results shown per page
+BROWSE_PAGE_SIZE = 25
+
+# Low-cardinality catalog columns stored as pandas categoricals
+CATEGORY_COLUMNS = ['step', 'suitable_skin_types', 'recommended_time', 'max_frequency']
+
+# Teaser bullets under "Your Next Skin Goals"
+NEXT_GOALS = ("Crystal clear skin", "Natural glow", "Youthful bounce")
+
+# Columns shown in the "Products Recommended for You" table
+RECOMMENDED_COLUMNS = ['product_id', 'name', 'primary_target', 'key_actives']
+
+# Heavy body cleansers left out of face routines (matched against lowercased names)
+FACE_EXCLUDED_RE = re.compile('body wash|shower gel')
+
+# Bits of a product's _flags (uint32): every attribute the base filters look at
+FLAG_RETINOL = 1 << 0
+FLAG_ACID = 1 << 1
+FLAG_RX_ONLY = 1 << 2
+FLAG_SENS_SAFE = 1 << 3
+FLAG_BODY = 1 << 4
+FLAG_FACE_EXCLUDED = 1 << 5
+FLAG_SKIN_ALL = 1 << 6
+FLAG_SKIN_OILY = 1 << 7
+FLAG_SKIN_ACNE = 1 << 8
+FLAG_SKIN_DRY = 1 << 9
+
+# Yes/No columns the safety filter reads (converted to bool at load) and their flag bits
+FLAG_COLUMNS = {
+    'contains_retinol': FLAG_RETINOL,
+    'prescription_only': FLAG_RX_ONLY,
+    'safe_for_sensitive': FLAG_SENS_SAFE,
+    'contains_acid': FLAG_ACID,
+}
+
+# Case-insensitive suitable_skin_types substring behind each skin flag
+SKIN_FLAG_TERMS = {
+    FLAG_SKIN_ALL: 'all',
+    FLAG_SKIN_OILY: 'oily',
+    FLAG_SKIN_ACNE: 'acne-prone',
+    FLAG_SKIN_DRY: 'dry',
+}
+
+# Extremely permissive skin type match: any of these flags fits, 'All' is everything,
+# oily also takes acne-prone
+SKIN_TYPE_FLAGS = {
+    "Oily": FLAG_SKIN_ALL | FLAG_SKIN_OILY | FLAG_SKIN_ACNE,
+    "Dry": FLAG_SKIN_ALL | FLAG_SKIN_DRY,
+    "Combination": FLAG_SKIN_ALL,
+    "Normal": FLAG_SKIN_ALL,
+}
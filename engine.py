@@ -0,0 +1,172 @@
+# Catalog loading, precomputed indexes and filtering. Kept out of app.py so it is
+# imported once per process; app.py holds only the Streamlit UI.
+import itertools
+from collections import defaultdict
+
+import numpy as np
+import streamlit as st
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from constants import (
+    AREAS,
+    CATALOG_COLUMNS,
+    CATALOG_PATH,
+    CATEGORY_COLUMNS,
+    CONCERN_BITS,
+    CONCERN_REGEX,
+    FACE_EXCLUDED_RE,
+    FLAG_ACID,
+    FLAG_BODY,
+    FLAG_COLUMNS,
+    FLAG_FACE_EXCLUDED,
+    FLAG_RETINOL,
+    FLAG_RX_ONLY,
+    FLAG_SENS_SAFE,
+    ROUTINE_STEPS,
+    SKIN_FLAG_TERMS,
+    SKIN_TYPE_FLAGS,
+    SKIN_TYPES,
+)
+
+# catalog_version (the CSV's mtime) is the only hashed argument, so editing the file reloads
+# it. Every cache built from the frame takes the same version next to its unhashed _df, so
+# the indexes are rebuilt with it and never point at rows of an older catalog.
+@st.cache_data(show_spinner=False)
+def load_products(catalog_version):
+    df = pd.read_csv(CATALOG_PATH, usecols=CATALOG_COLUMNS)
+    # Yes/No flags become real booleans, so masks compare bytes not strings
+    for col in FLAG_COLUMNS:
+        df[col] = df[col].eq('Yes')
+    # The catalog is static, so names are lowercased once here
+    df['_name_lower'] = df['name'].str.lower()
+    # Safety, area and skin-type attributes packed into one uint32 per product, so every base
+    # filter is a couple of integer ops on a single array (bits are FLAG_* in constants.py)
+    flags = np.zeros(len(df), dtype=np.uint32)
+    for col, bit in FLAG_COLUMNS.items():
+        flags[df[col].to_numpy()] |= bit
+    flags[df['_name_lower'].str.contains('body', regex=False, na=False).to_numpy()] |= FLAG_BODY
+    flags[df['_name_lower'].str.contains(FACE_EXCLUDED_RE, na=False).to_numpy()] |= FLAG_FACE_EXCLUDED
+    skin_lower = df['suitable_skin_types'].str.lower()
+    for bit, term in SKIN_FLAG_TERMS.items():
+        flags[skin_lower.str.contains(term, regex=False, na=True).to_numpy()] |= bit
+    df['_flags'] = flags
+    # Small repeated vocabularies become categoricals: int codes compare fast and the
+    # cached frame (copied on every rerun) shrinks
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype('category')
+    # Concern matching scans one lowercased blob instead of three columns; '|' never
+    # appears in a keyword, so matches cannot straddle two fields
+    df['_target_blob'] = (
+        df['primary_target'].fillna('') + '|' + df['secondary_target'].fillna('') + '|' + df['key_actives'].fillna('')
+    ).str.lower()
+    # One bit per concern, so a request's concern filter is a single vectorized bit-AND
+    bits = np.zeros(len(df), dtype=np.uint16)
+    for c, pat in CONCERN_REGEX.items():
+        bits[df['_target_blob'].str.contains(pat, na=False).to_numpy()] |= CONCERN_BITS[c]
+    df['_concern_bits'] = bits
+    return df
+
+@st.cache_resource
+def product_records(_df, catalog_version):
+    # Row dicts in catalog order, indexed by row position
+    return _df.to_dict('records')
+
+@st.cache_resource
+def step_index(_df, catalog_version):
+    # Sorted row positions of each routine step, built once instead of a step scan per request
+    steps = _df['step'].to_numpy()
+    return {step: np.flatnonzero(steps == step) for _, step, _ in ROUTINE_STEPS}
+
+@st.cache_resource
+def name_trigram_index(_df, catalog_version):
+    # trigram -> positions of every product name containing it
+    index = defaultdict(set)
+    for pos, name in enumerate(_df['_name_lower']):
+        if isinstance(name, str):
+            for i in range(len(name) - 2):
+                index[name[i:i + 3]].add(pos)
+    return index
+
+@st.cache_resource
+def name_arrow(_df, catalog_version):
+    # Lowercased names as one Arrow array for pyarrow.compute (pyarrow ships with streamlit)
+    return pa.array(_df['_name_lower'], type=pa.string())
+
+def search_products(df, catalog_version, query):
+    q = query.lower()
+    if len(q) < 3:
+        # Too short for a trigram lookup; Arrow's C++ substring kernel scans the names
+        hit = pc.match_substring(name_arrow(df, catalog_version), q).fill_null(False)
+        return df[hit.to_numpy(zero_copy_only=False)]
+    # Intersect trigram postings, rarest first so the working set only shrinks, then
+    # confirm the full substring on what is left
+    index = name_trigram_index(df, catalog_version)
+    postings = sorted((index.get(q[i:i + 3], set()) for i in range(len(q) - 2)), key=len)
+    hits = postings[0].intersection(*postings[1:])
+    names = df['_name_lower']
+    return df.iloc[sorted(pos for pos in hits if q in names.iat[pos])]
+
+def base_mask(df, area, skin_type, is_sensitive, is_pregnant, using_prescription):
+    # Bits a product must have, bits it must not have, and skin bits of which any one will do
+    need, forbid = 0, 0
+    # Super relaxed area filter
+    if area == "Face":
+        forbid |= FLAG_FACE_EXCLUDED  # only exclude heavy body cleansers
+    elif area == "Body":
+        need |= FLAG_BODY
+    # Safety only
+    if is_pregnant:
+        forbid |= FLAG_RETINOL | FLAG_RX_ONLY
+    if is_sensitive:
+        need |= FLAG_SENS_SAFE
+    if using_prescription:
+        forbid |= FLAG_RETINOL | FLAG_ACID
+    flags = df['_flags'].to_numpy()
+    return ((flags & need) == need) & ((flags & forbid) == 0) & ((flags & SKIN_TYPE_FLAGS[skin_type]) != 0)
+
+@st.cache_resource
+def build_index(_df, catalog_version):
+    # Area, skin type and the three safety flags are all discrete (3 × 4 × 8 = 96 buckets),
+    # so every combination's base mask is built once per process and looked up per request.
+    # The arrays are shared, so callers copy before modifying them.
+    index = {}
+    for area, skin_type in itertools.product(AREAS, SKIN_TYPES):
+        for flags in itertools.product((False, True), repeat=3):
+            index[(area, skin_type, *flags)] = base_mask(_df, area, skin_type, *flags)
+    return index
+
+@st.cache_data
+def compute_routine(_df, catalog_version, skin_type, concerns, is_sensitive, is_pregnant, using_prescription, area):
+    # Pure filtering half of the routine: candidate row positions per step, cached on the
+    # user's answers. Sampling stays outside so repeat submissions still vary.
+    df = _df
+    # Precomputed area/safety/skin-type bucket first, into a private buffer; if nothing
+    # survives it there is no point looking at concerns at all
+    keep = build_index(df, catalog_version)[(area, skin_type, is_sensitive, is_pregnant, using_prescription)].copy()
+    if not keep.any():
+        return {}
+
+    # Default to something useful if no concerns
+    if not concerns:
+        if skin_type == "Oily":
+            concerns = ["acne"]
+        elif skin_type == "Dry":
+            concerns = ["dryness"]
+        else:
+            concerns = ["dull"]
+
+    # Concerns filter — loose, any selected concern's bit counts
+    wanted = 0
+    for c in concerns:
+        wanted |= CONCERN_BITS.get(c, 0)
+    keep &= (df['_concern_bits'].to_numpy() & wanted) != 0
+
+    # Gather each step's prebuilt positions through the mask; the frame is never sliced
+    by_step = {}
+    for step, positions in step_index(df, catalog_version).items():
+        hits = positions[keep[positions]]
+        if len(hits):
+            by_step[step] = hits.tolist()
+    return by_step